@@ -1,8 +1,9 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
-import plotly.figure_factory as ff
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 import base64
 
 
@@ -17,34 +18,27 @@ st.set_page_config(
 
 # BACKGROUND IMAGE SETUP
 
+@st.cache_resource
 def get_base64_of_bin_file(bin_file):
+    # read and encode the image once per server process, not on every rerun
     with open(bin_file, 'rb') as f:
-        data = f.read()
-    return base64.b64encode(data).decode()
-
-def set_background(png_file):
-    bin_str = get_base64_of_bin_file(png_file)
-    page_bg_img = f'''
-    <style>
-    .stApp {{
-        background-image: url("data:image/png;base64,{bin_str}");
-        background-size: cover;
-        background-position: center;
-        background-repeat: no-repeat;
-        background-attachment: fixed;
-    }}
-    </style>
-    '''
-    st.markdown(page_bg_img, unsafe_allow_html=True)
-
-set_background("Red-and-Blue-COVID-19-Virus.jpg")
+        return base64.b64encode(f.read()).decode()
+
+bin_str = get_base64_of_bin_file("Red-and-Blue-COVID-19-Virus.jpg")
 
 
 # TITLE AND INTRODUCTION
 
-st.markdown("""
+st.markdown(f"""
 <style>
-.title-container {
+.stApp {{
+    background-image: url("data:image/jpeg;base64,{bin_str}");
+    background-size: cover;
+    background-position: center;
+    background-repeat: no-repeat;
+    background-attachment: fixed;
+}}
+.title-container {{
     background: rgba(255, 255, 255, 0.25); /* white */
     backdrop-filter: blur(8px); /* blur effect */
     -webkit-backdrop-filter: blur(8px);
@@ -53,22 +47,22 @@ st.markdown("""
     margin-bottom: 20px;
     border: 1px solid rgba(255, 255, 255, 0.25);
     text-align: center;
-}
-.title-container h1 {
+}}
+.title-container h1 {{
     color: white;
     font-size: 2.5em;
     margin-bottom: 10px;
-}
-.title-container p {
+}}
+.title-container p {{
     color: #f0f0f0;
     font-style: italic;
-}
-.title-list {
+}}
+.title-list {{
     text-align: left;
     display: inline-block;
     margin-top: 10px;
     font-size: 1.05em;
-}
+}}
 </style>
 
 <div class='title-container'>
@@ -85,24 +79,46 @@ st.markdown("""
 
 st.info("👉 Start by choosing a page from the left sidebar.")
 
-st.set_page_config(page_title="World Analysis", page_icon="🌐", layout="wide")
 st.markdown("<h2 style='text-align:center; color:white;'>🌍 World COVID-19 Data Analysis</h2>", unsafe_allow_html=True)
 
-@st.cache_data
+# NOTE: the loaders below use st.cache_resource, so every session shares the
+# same DataFrame objects. Treat world_data and data as read-only: never modify
+# them in place, derive new frames instead.
+@st.cache_resource
 def load_world_data():
-    df = pd.read_csv("worldometer_data.csv")
-    float_cols = df.select_dtypes(include=['float64']).columns
-    float_cols = float_cols.drop(['Tests/1M pop','Deaths/1M pop','Tot Cases/1M pop'])
-    for col in float_cols:
-        try:
-            df[col] = df[col].astype('Int64')
-        except Exception as e:
-            print(f"Could not convert column '{col}'. Error: {e}")
-    world_data =  df[df['Country/Region'] != 'Diamond Princess']
-    mask = world_data['WHO Region'].isna()
-    world_data.loc[mask, 'WHO Region'] = world_data.loc[mask, 'Continent']
-    world_data = world_data.fillna(0,inplace=True)
-    return df
+    df = pd.read_parquet(
+        "worldometer_data.parquet",
+        engine="pyarrow",
+        columns=['Country/Region', 'Continent', 'WHO Region', 'Population',
+                 'TotalCases', 'NewCases', 'TotalDeaths', 'NewDeaths',
+                 'TotalRecovered', 'NewRecovered', 'ActiveCases', 'Serious,Critical',
+                 'Tot Cases/1M pop', 'Deaths/1M pop', 'TotalTests', 'Tests/1M pop']
+    )
+    world_data = df.loc[df['Country/Region'] != 'Diamond Princess'].copy()
+    world_data['WHO Region'] = world_data['WHO Region'].fillna(world_data['Continent'])
+    world_data.fillna(0, inplace=True)
+    # low-cardinality labels: groupby/isin work on integer codes
+    for c in ('Country/Region', 'WHO Region', 'Continent'):
+        world_data[c] = world_data[c].astype('category')
+    return world_data
+
+@st.cache_data
+def compute_corr(df):
+    world_CP = df.select_dtypes(include='number')  # keep numeric only
+    return world_CP.corr()
+
+@st.cache_data
+def totals_by_country(df, metrics):
+    return df.groupby('Country/Region', sort=False, observed=True)[metrics].sum()
+
+@st.cache_data
+def top10_all(df, metrics):
+    return (
+        df.groupby('Country/Region', observed=True)[metrics]
+        .sum()
+        .nlargest(10, 'TotalDeaths')
+        .reset_index()
+    )
 
 world_data = load_world_data()
 
@@ -121,23 +137,21 @@ st.markdown(
 )
 
 
-# --- Data Cleaning ---
-world_CP = world_data.copy()
-world_CP = world_CP.select_dtypes(include=['number'])  # keep numeric only
+# --- Compute Correlation (numeric columns only) ---
+Correlations = compute_corr(world_data)
 
-# --- Compute Correlation ---
-Correlations = world_CP.corr()
 
-
-fig_corr = ff.create_annotated_heatmap(
-    z=Correlations.values,
+fig_corr = go.Figure(go.Heatmap(
+    z=Correlations.values.tolist(),
     x=list(Correlations.columns),
     y=list(Correlations.index),
-    annotation_text=Correlations.values.round(2),
+    text=Correlations.round(2).values.tolist(),
+    texttemplate="%{text}",
     colorscale="RdBu",
     showscale=True,
     reversescale=True,
-)
+    zmid=0,
+))
 
 fig_corr.update_layout(
     title=dict(
@@ -152,7 +166,7 @@ fig_corr.update_layout(
     plot_bgcolor='rgba(0,0,0,0)',
 )
 
-st.plotly_chart(fig_corr, use_container_width=True)
+st.plotly_chart(fig_corr, use_container_width=True, config={'staticPlot': True})
 
 # --- Optional Insight Section ---
 with st.expander("🧠 Interpretation Tips"):
@@ -170,14 +184,11 @@ st.markdown("<h2 style='text-align:center; color:white;'>📊 Top 10 Countries b
 
 metrics = ['TotalTests', 'TotalCases', 'TotalDeaths', 'TotalRecovered']
 
+# one groupby for all four metrics, sliced per chart
+agg = totals_by_country(world_data, metrics)
+
 for metric in metrics:
-    df_metric = (
-        world_data.groupby('Country/Region')[metric]
-        .sum()
-        .reset_index()
-        .sort_values(by=metric, ascending=False)
-        .head(10)
-    )
+    df_metric = agg[metric].nlargest(10).reset_index()
 
     fig_bar = px.bar(
         df_metric,
@@ -201,7 +212,8 @@ for metric in metrics:
         paper_bgcolor='rgba(0,0,0,0)',
         height=500
     )
-    st.plotly_chart(fig_bar, use_container_width=True)
+    # stable key per metric so reruns update the existing chart instead of remounting it
+    st.plotly_chart(fig_bar, use_container_width=True, config={'staticPlot': True}, key=f'top10_{metric}')
 
 
 # 3️⃣ Combined Comparison
@@ -210,13 +222,7 @@ st.markdown("<h2 style='text-align:center; color:white;'>🌍 Comparison of Top
 
 totals = ['TotalTests', 'TotalCases', 'TotalDeaths', 'TotalRecovered']
 
-totals_grouped = (
-    world_data.groupby('Country/Region')[totals]
-    .sum()
-    .reset_index()
-    .sort_values(by='TotalDeaths', ascending=False)
-    .head(10)
-)
+totals_grouped = top10_all(world_data, totals)
 
 totals_melted = totals_grouped.melt(
     id_vars=['Country/Region'],
@@ -239,21 +245,75 @@ fig_melt.update_layout(    title=dict(
         xanchor='center',
         font=dict(size=20, color='white')
     ),plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',height=600)
+        paper_bgcolor='rgba(0,0,0,0)',height=600,
+        uirevision='constant')
 st.plotly_chart(fig_melt, use_container_width=True)
 
 
 # LOAD DATA
-st.set_page_config(page_title="Grouped Data Analysis", page_icon="📅", layout="wide")
 
 st.markdown("<h2 style='text-align:center; color:white;'>🌍 World COVID-19 Data Analysis</h2>", unsafe_allow_html=True)
 
-@st.cache_data
+@st.cache_resource
 def load_data():
-    df = pd.read_csv("full_grouped.csv")
-    df['Date'] = pd.to_datetime(df['Date'])
+    # Date is already stored as a timestamp in the Parquet file
+    df = pd.read_parquet(
+        "full_grouped.parquet",
+        engine="pyarrow",
+        columns=['Date', 'WHO Region', 'Country/Region',
+                 'Confirmed', 'Deaths', 'Recovered', 'Active',
+                 'New cases', 'New deaths', 'New recovered']
+    )
+    for c in ('Country/Region', 'WHO Region'):
+        df[c] = df[c].astype('category')
+    # keep rows ordered by Date so the date filter can bisect
+    df = df.sort_values('Date', kind='stable').reset_index(drop=True)
     return df
 
+def category_mask(col, values):
+    # compare integer category codes instead of hashing strings per row
+    codes = col.cat.categories.get_indexer(values)
+    return np.isin(col.cat.codes.to_numpy(), codes[codes >= 0])
+
+# _df is left out of the cache key (hashing 35k rows costs more than a rerun
+# saves); data_token identifies the shared frame from load_data instead
+@st.cache_data(max_entries=64)
+def build_filtered_aggs(_df, data_token, regions, countries, start, end):
+    # _df is sorted by Date, so the date range is a contiguous row slice
+    dates = _df['Date'].to_numpy()
+    lo = np.searchsorted(dates, start.to_datetime64(), side='left')
+    hi = np.searchsorted(dates, end.to_datetime64(), side='right')
+    sliced = _df.iloc[lo:hi]
+
+    # one boolean array combined in place, then a single gather of the
+    # rows and only the columns the aggregations below read
+    mask = category_mask(sliced['WHO Region'], regions)
+    if countries:
+        np.logical_and(mask, category_mask(sliced['Country/Region'], countries), out=mask)
+    cols = ['Date', 'WHO Region', 'Country/Region', 'Confirmed', 'Deaths', 'Recovered', 'Active']
+    filtered_data = sliced.iloc[np.flatnonzero(mask), sliced.columns.get_indexer(cols)]
+
+    global_data = (
+        filtered_data.groupby('Date', sort=False)[['Confirmed', 'Deaths', 'Recovered']]
+        .sum()
+        .reset_index()
+    )
+    region_deaths = (
+        filtered_data.groupby('WHO Region', sort=False, observed=True)['Deaths']
+        .mean()
+        .reset_index()
+        .sort_values('Deaths', ascending=False)
+    )
+    # latest row per country, indexed for direct lookups; filtered_data keeps
+    # the Date order of _df, so tail(1) is already the most recent row
+    last = (
+        filtered_data.groupby('Country/Region', observed=True)
+        .tail(1)
+        .set_index('Country/Region')
+    )
+    top5 = last['Confirmed'].nlargest(5).index.tolist()
+    return global_data, region_deaths, last, top5
+
 data = load_data()
 
 st.markdown("<h2 style='text-align:center; color:white;'>Covid-19 Grouped Data </h2>", unsafe_allow_html=True)
@@ -265,7 +325,7 @@ st.dataframe(data)
 st.sidebar.header("🧭 Dashboard Filters")
 
 # --- Region Filter with "Select All" ---
-all_regions = sorted(data['WHO Region'].dropna().unique())
+all_regions = data['WHO Region'].cat.categories.tolist()  # categories are already sorted
 
 select_all_regions = st.sidebar.checkbox("Select All Regions", value=True)
 
@@ -283,7 +343,7 @@ else:
     )
 
 # --- Country Filter ---
-all_countries = sorted(data['Country/Region'].dropna().unique())
+all_countries = data['Country/Region'].cat.categories.tolist()
 selected_country = st.sidebar.multiselect(
     "Select Country(s):",
     options=all_countries,
@@ -303,39 +363,35 @@ date_range = st.sidebar.date_input(
 start_date = pd.Timestamp(date_range[0])
 end_date = pd.Timestamp(date_range[1])
 
-filtered_data = data[
-    (data['WHO Region'].isin(selected_region)) &
-    (data['Date'].between(start_date, end_date))
-]
-
-if selected_country:
-    filtered_data = filtered_data[filtered_data['Country/Region'].isin(selected_country)]
+# data is a single cache_resource object kept alive for the whole process,
+# so its id() changes only when load_data actually reloads
+global_data, region_deaths, last, top5 = build_filtered_aggs(
+    data, id(data), selected_region, selected_country, start_date, end_date
+)
 
 
 # GLOBAL TRENDS
 
 st.markdown("<h2 style='text-align:center; color:white;'>🌐 Global Trends Over Time</h2>", unsafe_allow_html=True)
 
-global_data = (
-    filtered_data.groupby('Date')[['Confirmed', 'Deaths', 'Recovered']]
-    .sum()
-    .reset_index()
-)
-
-fig_global = px.line(
-    global_data,
-    x='Date', y=['Confirmed', 'Deaths', 'Recovered'],
-    title="Global COVID-19 Progression (Filtered)",
-    labels={'value': 'Number of Cases', 'variable': 'Metric'},
-)
+# WebGL lines instead of SVG
+fig_global = go.Figure()
+for col in ['Confirmed', 'Deaths', 'Recovered']:
+    fig_global.add_trace(
+        go.Scattergl(x=global_data['Date'], y=global_data[col], name=col, mode='lines')
+    )
 fig_global.update_layout(title=dict(text="🌐 Global COVID-19 Progression (Filtered)",
         x=0.5,
         xanchor='center',
         font=dict(size=20, color='white')
     ),
+    xaxis_title='Date',
+    yaxis_title='Number of Cases',
+    legend_title='Metric',
     template="plotly",
     paper_bgcolor='rgba(0,0,0,0)',
-    plot_bgcolor='rgba(0,0,0,0)'
+    plot_bgcolor='rgba(0,0,0,0)',
+    uirevision='constant'  # keep zoom/legend state across filter changes
 )
 st.plotly_chart(fig_global, use_container_width=True)
 
@@ -344,13 +400,6 @@ st.plotly_chart(fig_global, use_container_width=True)
 
 st.markdown("<h2 style='text-align:center; color:white;'>🗺️ Regional Impact – Deaths per 1M Population", unsafe_allow_html=True)
 
-region_deaths = (
-    filtered_data.groupby('WHO Region')
-    .agg({'Deaths': 'mean'})
-    .reset_index()
-    .sort_values('Deaths', ascending=False)
-)
-
 fig_region = px.bar(
     region_deaths,
     x='WHO Region', y='Deaths',
@@ -365,7 +414,8 @@ fig_region.update_layout(title=dict(
     ),
     showlegend=False,
     paper_bgcolor='rgba(0,0,0,0)',
-    plot_bgcolor='rgba(0,0,0,0)'
+    plot_bgcolor='rgba(0,0,0,0)',
+    uirevision='constant'
 )
 st.plotly_chart(fig_region, use_container_width=True)
 
@@ -374,48 +424,41 @@ st.plotly_chart(fig_region, use_container_width=True)
 
 st.markdown("<h2 style='text-align:center; color:white;'>🖐️ Top 5 Most Affected Countries",unsafe_allow_html=True)
 
-top5 = (
-    filtered_data.groupby('Country/Region')
-    .agg({'Confirmed': 'max'})
-    .sort_values('Confirmed', ascending=False)
-    .head(5)
-    .index.tolist()
-)
+labels = ['Active', 'Recovered', 'Deaths']
+color_map = ['#1E90FF', '#2ECC71', '#E74C3C']
 
-cols = st.columns(5)
+# all five pies in one figure, rendered once
+fig_pie = make_subplots(
+    rows=1, cols=5,
+    specs=[[{'type': 'domain'}] * 5],
+    subplot_titles=[f"{country} Case Distribution" for country in top5]
+)
 for i, country in enumerate(top5):
-    subset = filtered_data[filtered_data['Country/Region'] == country]
-    if subset.empty:
-        continue
-    last_row = subset.iloc[-1]
-
-    labels = ['Active', 'Recovered', 'Deaths']
+    last_row = last.loc[country]
     values = [
         last_row.get('Active', 0),
         last_row.get('Recovered', 0),
         last_row.get('Deaths', 0)
     ]
-    color_map = ['#1E90FF', '#2ECC71', '#E74C3C'] 
-
-    fig_pie = go.Figure(
-        data=[go.Pie(
+    fig_pie.add_trace(
+        go.Pie(
             labels=labels,
             values=values,
             hole=0.4,
             marker=dict(colors=color_map),
             textinfo='label+percent'
-        )]
+        ),
+        row=1, col=i + 1
     )
 
-    fig_pie.update_layout(
-        title=f"{country} Case Distribution",
-        template="plotly_white",
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        showlegend=False
-    )
+fig_pie.update_layout(
+    template="plotly_white",
+    paper_bgcolor='rgba(0,0,0,0)',
+    plot_bgcolor='rgba(0,0,0,0)',
+    showlegend=False
+)
 
-    cols[i].plotly_chart(fig_pie, use_container_width=True)
+st.plotly_chart(fig_pie, use_container_width=True)
 
 
 
@@ -0,0 +1,12 @@
+import pandas as pd
+
+
+# ONE-TIME CONVERSION OF THE SOURCE CSV FILES TO PARQUET
+# Run once after updating the CSV files: python convert_to_parquet.py
+
+df = pd.read_csv("worldometer_data.csv")
+df.to_parquet("worldometer_data.parquet", engine="pyarrow", compression="zstd", index=False)
+
+full_grouped = pd.read_csv("full_grouped.csv")
+full_grouped['Date'] = pd.to_datetime(full_grouped['Date'])  # stored as Arrow timestamp
+full_grouped.to_parquet("full_grouped.parquet", engine="pyarrow", compression="zstd", index=False)